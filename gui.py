@@ -1,6 +1,9 @@
 import tkinter as tk
 from tkinter import ttk, scrolledtext, font
 import threading
+import queue
+import functools
+import heapq
 import time
 import random
 from typing import Dict, List, Optional, Tuple
@@ -9,11 +12,15 @@ from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
 # Import from our memory_allocation_engine module
 from memory_allocation_engine import MemoryManager, ProcessGenerator, AllocationMethod
 # Import visualization classes
-from visualization import MemoryVisualizer, ModernUI
+from visualization import MemoryVisualizer, TkCanvasVisualizer, ModernUI
 
 # Memory Visualizer GUI
 class MemoryVisualizerGUI:
-    def __init__(self, root):
+    # Oldest event log lines are dropped beyond this many
+    MAX_LOG_LINES = 500
+    
+    def __init__(self, root, renderer="matplotlib"):
+        # renderer is "matplotlib" (MemoryVisualizer) or "tk" (TkCanvasVisualizer)
         self.root = root
         self.root.title("Memory Allocation Visualizer")
         self.root.geometry("1280x800")
@@ -23,17 +30,64 @@ class MemoryVisualizerGUI:
         self.memory_size = 256
         self.page_size = 16
         self.memory_manager = MemoryManager(self.memory_size, self.page_size)
-        self.visualizer = MemoryVisualizer()
+        self.renderer = renderer
+        # Created with the visualization panel; the Tk renderer needs its parent
+        self.visualizer = None
+        # Matplotlib canvas, None with the Tk renderer
+        self.canvas = None
         self.process_generator = ProcessGenerator(4, 64)
         self.allocated_process_ids = set()
+        # Processes added before the simulation starts, plus their IDs for O(1) lookups
+        self.pending_processes = []
+        self._pending_pids = set()
         
+        # Python-side copies of the method Combobox, refreshed on <<ComboboxSelected>>
+        # so hot paths don't have to read the Tk variable
+        self._allocation_method = "paging"
         self.allocation_method = AllocationMethod.PAGING
         
         self.simulation_running = False
-        self.simulation_thread = None
-        self.simulation_speed = 1.0
+        # Pending root.after id of the auto-generate tick, if one is scheduled
+        self._auto_tick_id = None
         self.auto_generate_processes = False # New flag for auto process generation
         
+        # All MemoryManager mutations run on a single allocator thread. The GUI
+        # posts commands to cmd_q; the worker publishes the latest snapshot to
+        # snap_q and hands completion callbacks back through _gui_call.
+        self.cmd_q = queue.Queue()
+        self.snap_q = queue.Queue(maxsize=1)
+        # Calls marshaled from other threads onto the Tk thread, see _gui_call
+        self._gui_q = queue.SimpleQueue()
+        self._snapshot = None
+        # Set to force a redraw of the current snapshot on the next tick
+        self._view_dirty = True
+        # (method, memory_size, page_size) of the last full canvas draw
+        self._last_layout = None
+        # True while the main window is minimized/unmapped
+        self._hidden = False
+        self.root.bind("<Map>", self._on_root_map, add="+")
+        self.root.bind("<Unmap>", self._on_root_map, add="+")
+        
+        # Pending auto-removals as a (expiry_time, generation, process_id)
+        # min-heap, served by one expiry thread instead of a Timer thread per
+        # process
+        self._expiry_heap = []
+        # Bumped on every reset; callbacks and expiries from an older
+        # generation refer to the old memory and are dropped
+        self._generation = 0
+        self._expiry_lock = threading.Lock()
+        self._expiry_evt = threading.Event()
+        # Last text set on each stats panel field
+        self._last_stats = {}
+        
+        # Log messages are buffered as (text, tags) pairs and written to the
+        # event log in one insert per idle cycle
+        self._log_buf = []
+        self._log_flush_pending = False
+        self._log_lines = 0
+        # Last formatted log timestamp and the second it was formatted for
+        self._last_sec = 0
+        self._last_ts = ""
         
         self.main_frame = ttk.Frame(self.root)
         self.main_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=20)
@@ -51,6 +105,15 @@ class MemoryVisualizerGUI:
         self._create_log_panel()
         self._create_stats_panel()
         
+        self.allocator_thread = threading.Thread(target=self._allocator_loop)
+        self.allocator_thread.daemon = True
+        self.allocator_thread.start()
+        
+        self.expiry_thread = threading.Thread(target=self._expiry_loop)
+        self.expiry_thread.daemon = True
+        self.expiry_thread.start()
+        
+        self._drain_gui_q()
         self._update_visualization()
     
     def _create_header(self):
@@ -61,7 +124,7 @@ class MemoryVisualizerGUI:
                                 font=self.fonts['title'], foreground=ModernUI.PRIMARY)
         title_label.pack(anchor="w")
         
-        description = "Interactive visualization of memory allocation strategies: paging and segmentation"
+        description = "Interactive visualization of memory allocation strategies: paging, segmentation and buddy allocation"
         desc_label = ttk.Label(header_frame, text=description, foreground=ModernUI.SUBTEXT)
         desc_label.pack(anchor="w")
         
@@ -69,10 +132,10 @@ class MemoryVisualizerGUI:
         separator.grid(row=0, column=0, columnspan=2, sticky="ew", pady=(40, 0))
     
     def _create_control_panel(self):
-        left_panel = ttk.Frame(self.main_frame)
-        left_panel.grid(row=1, column=0, padx=(0, 15), sticky="ns")
+        self.left_panel = ttk.Frame(self.main_frame)
+        self.left_panel.grid(row=1, column=0, padx=(0, 15), sticky="ns")
         
-        control_frame = ttk.LabelFrame(left_panel, text="Simulation Controls")
+        control_frame = ttk.LabelFrame(self.left_panel, text="Simulation Controls")
         control_frame.pack(fill=tk.X, padx=0, pady=(0, 15))
         
         controls_grid = ttk.Frame(control_frame)
@@ -91,8 +154,9 @@ class MemoryVisualizerGUI:
         ttk.Label(controls_grid, text="Allocation Method:").grid(row=2, column=0, padx=5, pady=8, sticky="w")
         self.allocation_method_var = tk.StringVar(value="paging")
         allocation_method_combo = ttk.Combobox(controls_grid, textvariable=self.allocation_method_var, 
-                                               values=["paging", "segmentation"], state="readonly", width=12)
+                                               values=["paging", "segmentation", "buddy"], state="readonly", width=12)
         allocation_method_combo.grid(row=2, column=1, padx=5, pady=8, sticky="w")
+        allocation_method_combo.bind("<<ComboboxSelected>>", self._on_allocation_method_selected)
         
         ttk.Label(controls_grid, text="Simulation Speed:").grid(row=3, column=0, padx=5, pady=8, sticky="w")
         self.speed_var = tk.DoubleVar(value=1.0)
@@ -132,6 +196,17 @@ class MemoryVisualizerGUI:
                                             style="Success.TButton", command=self._toggle_simulation)
         self.start_stop_button.pack(fill=tk.X, padx=10, pady=(0, 10))
     
+    def _on_allocation_method_selected(self, event=None):
+        self._allocation_method = self.allocation_method_var.get()
+        if self._allocation_method == "paging":
+            self.allocation_method = AllocationMethod.PAGING
+        elif self._allocation_method == "buddy":
+            self.allocation_method = AllocationMethod.BUDDY
+        else:
+            self.allocation_method = AllocationMethod.SEGMENTATION
+        # The table view depends on the method, so redraw when it changes
+        self._invalidate_view()
+    
     def _toggle_auto_generate(self):
         """Toggle auto-generation of processes"""
         self.auto_generate_processes = self.auto_generate_var.get()
@@ -141,8 +216,7 @@ class MemoryVisualizerGUI:
             self._log_message("Auto-generate processes disabled", "info")
     
     def _create_process_panel(self):
-        left_panel = self.main_frame.grid_slaves(row=1, column=0)[0]
-        process_frame = ttk.LabelFrame(left_panel, text="Process Management")
+        process_frame = ttk.LabelFrame(self.left_panel, text="Process Management")
         process_frame.pack(fill=tk.X, padx=0, pady=0)
         
         process_grid = ttk.Frame(process_frame)
@@ -179,7 +253,14 @@ class MemoryVisualizerGUI:
         vis_frame = ttk.LabelFrame(self.main_frame, text="Memory Visualization")
         vis_frame.grid(row=1, column=1, sticky="nsew", padx=(0, 0), pady=(0, 15))
         
+        if self.renderer == "tk":
+            self.visualizer = TkCanvasVisualizer(vis_frame)
+            self.visualizer.get_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+            return
+        
+        self.visualizer = MemoryVisualizer()
         self.canvas = FigureCanvasTkAgg(self.visualizer.get_figure(), master=vis_frame)
+        self.visualizer.attach_canvas(self.canvas)
         self.canvas.draw()
         self.canvas.get_tk_widget().pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
     
@@ -199,56 +280,209 @@ class MemoryVisualizerGUI:
         stats_frame = ttk.LabelFrame(self.main_frame, text="Memory Statistics")
         stats_frame.grid(row=2, column=0, sticky="nsew", padx=(0, 15), pady=(0, 0))
         
-        self.stats_text = tk.Text(stats_frame, height=12, width=30, font=self.fonts['small'])
-        self.stats_text.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
-        self.stats_text.configure(state="disabled")
+        stats_grid = ttk.Frame(stats_frame)
+        stats_grid.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        # One label per value, bound to a StringVar so updates are a single set()
+        sections = (
+            ("Memory Utilization", (("Total Memory", 'total'), ("Used Memory", 'used'),
+                                    ("Free Memory", 'free'), ("Utilization", 'util'))),
+            ("Active Processes", (("Process Count", 'count'),
+                                  # Display fragmentation information
+                                  ("External Fragmentation", 'ext'), ("Internal Fragmentation", 'int'))),
+        )
+        self._stat_vars = {}
+        row = 0
+        for heading, fields in sections:
+            ttk.Label(stats_grid, text=heading, font=self.fonts['heading'],
+                      foreground=ModernUI.PRIMARY).grid(row=row, column=0, columnspan=2, sticky="w",
+                                                        pady=(10 if row else 0, 2))
+            row += 1
+            for label, key in fields:
+                self._stat_vars[key] = tk.StringVar()
+                ttk.Label(stats_grid, text=f"{label}:", font=self.fonts['small']).grid(row=row, column=0, sticky="w")
+                ttk.Label(stats_grid, textvariable=self._stat_vars[key],
+                          font=self.fonts['small']).grid(row=row, column=1, padx=(5, 0), sticky="w")
+                row += 1
+    
+    def _allocator_loop(self):
+        """Worker thread: the only place MemoryManager is touched after startup"""
+        self._publish_snapshot()
+        while True:
+            cmd = self.cmd_q.get()
+            kind, on_done = cmd[0], cmd[-1]
+            # Keep the worker alive: an uncaught error here would leave every
+            # later command stuck in cmd_q
+            try:
+                result, changed = self._run_command(cmd)
+            except Exception as exc:
+                self._gui_call(self._log_message, f"Command '{kind}' failed: {exc!r}", "error")
+                result = [False] * len(cmd[1]) if kind in ("alloc_batch", "free_batch") else False
+                changed = False
+            if changed:
+                # A failed publish must not be reported as a failed command: the
+                # memory did change, and on_done has to schedule its expiry
+                try:
+                    self._publish_snapshot()
+                except Exception as exc:
+                    self._gui_call(self._log_message, f"Publishing a snapshot failed: {exc!r}", "error")
+            if on_done is not None:
+                self._gui_call(on_done, result)
+    
+    def _run_command(self, cmd):
+        """Apply one cmd_q command; returns (result, whether memory changed)"""
+        kind = cmd[0]
+        if kind == "alloc":
+            _, process_id, size, method, _ = cmd
+            result = changed = self.memory_manager.allocate_process(process_id, size, method)
+        elif kind == "alloc_batch":
+            _, requests, _ = cmd
+            result = self.memory_manager.allocate_batch(requests)
+            changed = any(result)
+        elif kind == "free":
+            _, process_id, _ = cmd
+            result = changed = self.memory_manager.deallocate_process(process_id)
+        elif kind == "free_batch":
+            _, process_ids, _ = cmd
+            result = self.memory_manager.deallocate_processes(process_ids)
+            changed = any(result)
+        elif kind == "reset":
+            _, memory_size, page_size, _ = cmd
+            self.memory_manager = MemoryManager(memory_size, page_size)
+            result = changed = True
+        else:
+            result = changed = False
+        return result, changed
+    
+    def _publish_snapshot(self):
+        # Snapshots are read-only and replaced rather than changed by later
+        # mutations, so the GUI thread can keep them without copying
+        mm = self.memory_manager
+        snapshot = {
+            'memory': mm.get_memory_snapshot(),
+            'page_table': mm.get_page_table_snapshot(),
+            'stats': mm.get_memory_stats(),
+            'memory_size': mm.memory_size,
+            'page_size': mm.page_size,
+        }
+        # Drop any snapshot the GUI has not picked up yet; only the latest matters
+        try:
+            self.snap_q.get_nowait()
+        except queue.Empty:
+            pass
+        self.snap_q.put_nowait(snapshot)
+    
+    def _gui_call(self, fn, *args):
+        """Run fn(*args) on the Tk thread; safe to call from any thread"""
+        self._gui_q.put((fn, args))
+    
+    def _drain_gui_q(self):
+        # Reschedule first so a callback that raises cannot stop the pump;
+        # anything left in the queue is picked up on the next round
+        self.root.after(50, self._drain_gui_q)
+        while True:
+            try:
+                fn, args = self._gui_q.get_nowait()
+            except queue.Empty:
+                break
+            fn(*args)
+    
+    def _invalidate_view(self):
+        """Force the next visualization tick to redraw"""
+        self._view_dirty = True
+    
+    def _on_root_map(self, event):
+        # Child widgets inherit the root's bindings, only track the window itself
+        if event.widget is self.root:
+            self._hidden = event.type == tk.EventType.Unmap
     
     def _update_visualization(self):
-        memory_snapshot = self.memory_manager.get_memory_snapshot()
-        page_table_snapshot = self.memory_manager.get_page_table_snapshot()
-        stats = self.memory_manager.get_memory_stats()
-        events = self.memory_manager.get_recent_events()
-        
-        method = self.allocation_method_var.get()
-        self.visualizer.update_visualization(memory_snapshot, page_table_snapshot, stats, events,
-                                             self.memory_size, self.page_size, method)
-        self.canvas.draw_idle()
-        self._update_stats(stats)
-        self._update_log(events)
+        if self._hidden:
+            # Nothing is visible; poll slowly, the latest snapshot waits in snap_q
+            self.root.after(1000, self._update_visualization)
+            return
         self.root.after(100, self._update_visualization)
+        
+        # The worker publishes only after a change, so a queued snapshot always
+        # needs drawing; otherwise redraw only when the view was invalidated
+        try:
+            self._snapshot = self.snap_q.get_nowait()
+        except queue.Empty:
+            if not self._view_dirty:
+                return
+        if self._snapshot is None:
+            return
+        self._view_dirty = False
+        
+        snapshot = self._snapshot
+        method = self._allocation_method
+        self.visualizer.update_visualization(snapshot['memory'], snapshot['page_table'],
+                                             snapshot['stats'], (),
+                                             snapshot['memory_size'], snapshot['page_size'], method)
+        # Tk canvas items repaint themselves once reconfigured; only the
+        # matplotlib canvas has to be drawn
+        if self.canvas is not None:
+            layout = (method, snapshot['memory_size'], snapshot['page_size'])
+            if layout != self._last_layout:
+                # Titles are part of the cached background, so re-render everything
+                self._last_layout = layout
+                self.canvas.draw()
+            else:
+                self.visualizer.blit()
+        self._update_stats(snapshot['stats'])
     
-    def _update_stats(self, stats):
-        self.stats_text.configure(state="normal")
-        self.stats_text.delete(1.0, tk.END)
-        self.stats_text.insert(tk.END, "Memory Utilization\n", "heading")
-        self.stats_text.insert(tk.END, f"Total Memory: {stats.get('total_memory', 0)} units\n")
-        self.stats_text.insert(tk.END, f"Used Memory: {stats.get('used_memory', 0)} units\n")
-        self.stats_text.insert(tk.END, f"Free Memory: {stats.get('free_memory', 0)} units\n")
+    def _format_stats(self, stats):
+        """Return the text of each value field in the stats panel"""
         utilization = 0
         if stats.get('total_memory', 0) > 0:
             utilization = (stats.get('used_memory', 0) / stats.get('total_memory', 0)) * 100
-        self.stats_text.insert(tk.END, f"Utilization: {utilization:.1f}%\n\n")
-        self.stats_text.insert(tk.END, "Active Processes\n", "heading")
-        self.stats_text.insert(tk.END, f"Process Count: {stats.get('process_count', 0)}\n")
-        # Display fragmentation information
-        self.stats_text.insert(tk.END, f"External Fragmentation: {stats.get('external_fragmentation', 0):.2f}\n")
-        self.stats_text.insert(tk.END, f"Internal Fragmentation: {stats.get('internal_fragmentation', 0)} units\n")
-        self.stats_text.tag_configure("heading", font=self.fonts['heading'], foreground=ModernUI.PRIMARY)
-        self.stats_text.configure(state="disabled")
-    
-    def _update_log(self, events):
-        # This method can be expanded if you want to show recent events in the stats panel.
-        pass
+        return {
+            'total': f"{stats.get('total_memory', 0)} units",
+            'used': f"{stats.get('used_memory', 0)} units",
+            'free': f"{stats.get('free_memory', 0)} units",
+            'util': f"{utilization:.1f}%",
+            'count': f"{stats.get('process_count', 0)}",
+            'ext': f"{stats.get('external_fragmentation', 0):.2f}",
+            'int': f"{stats.get('internal_fragmentation', 0)} units",
+        }
+    
+    def _update_stats(self, stats):
+        values = self._format_stats(stats)
+        # Only touch the fields whose text actually changed
+        for key, value in values.items():
+            if value != self._last_stats.get(key):
+                self._stat_vars[key].set(value)
+        self._last_stats = values
     
     def _log_message(self, message, message_type="info"):
-        timestamp = time.strftime("%H:%M:%S", time.localtime())
-        self.log_text.insert(tk.END, f"[{timestamp}] ", "timestamp")
-        self.log_text.insert(tk.END, f"{message}\n", message_type)
+        sec = int(time.time())
+        if sec != self._last_sec:
+            self._last_sec = sec
+            self._last_ts = time.strftime("%H:%M:%S", time.localtime(sec))
+        self._log_buf.extend((f"[{self._last_ts}] ", "timestamp", f"{message}\n", message_type))
+        if not self._log_flush_pending:
+            self._log_flush_pending = True
+            self.root.after_idle(self._flush_log)
+    
+    def _flush_log(self):
+        self._log_flush_pending = False
+        if not self._log_buf:
+            return
+        buf, self._log_buf = self._log_buf, []
+        self.log_text.insert(tk.END, *buf)
+        self._log_lines += len(buf) // 4
+        if self._log_lines > self.MAX_LOG_LINES:
+            excess = self._log_lines - self.MAX_LOG_LINES
+            self.log_text.delete("1.0", f"{excess + 1}.0")
+            self._log_lines = self.MAX_LOG_LINES
         self.log_text.see(tk.END)
     
     def _toggle_simulation(self):
         if self.simulation_running:
             self.simulation_running = False
+            if self._auto_tick_id is not None:
+                self.root.after_cancel(self._auto_tick_id)
+                self._auto_tick_id = None
             self.start_stop_var.set("Start Simulation")
             self._log_message("Simulation stopped", "info")
         else:
@@ -256,33 +490,39 @@ class MemoryVisualizerGUI:
             self.start_stop_var.set("Stop Simulation")
             self._log_message("Simulation started", "success")
 
-            # Allocate pending processes when simulation starts
-            if hasattr(self, 'pending_processes'):
-                for process_id, size, method, lifetime in self.pending_processes:
-                    success = self.memory_manager.allocate_process(process_id, size, method)
-                    if success:
-                        self._log_message(f"Pending process {process_id} started (size {size}, lifetime {lifetime}s)", "success")
-                        self._schedule_auto_removal(process_id, lifetime)
-                    else:
-                        self._log_message(f"Failed to start pending process {process_id}", "error")
-                self.pending_processes.clear()  # Clear pending queue after allocation
+            # Allocate pending processes when simulation starts, as one batch
+            if self.pending_processes:
+                pending = list(self.pending_processes)
+                requests = [(process_id, size, method) for process_id, size, method, _ in pending]
+                self.allocated_process_ids.update(process_id for process_id, _, _, _ in pending)
+                on_done = functools.partial(self._on_pending_allocated, self._generation, pending)
+                self.cmd_q.put(("alloc_batch", requests, on_done))
+            self.pending_processes.clear()  # Clear pending queue after allocation
+            self._pending_pids.clear()
 
             if self.auto_generate_processes:
-                self.simulation_thread = threading.Thread(target=self._run_simulation)
-                self.simulation_thread.daemon = True
-                self.simulation_thread.start()
-
-
+                self._log_message("Auto-generating processes...", "info")
+                self._auto_tick()
+    
+    def _on_pending_allocated(self, generation, pending, results):
+        if generation != self._generation:
+            return
+        for (process_id, size, _, lifetime), success in zip(pending, results):
+            if success:
+                self._log_message(f"Pending process {process_id} started (size {size}, lifetime {lifetime}s)", "success")
+                self._schedule_auto_removal(process_id, lifetime)
+            else:
+                self.allocated_process_ids.discard(process_id)
+                self._log_message(f"Failed to start pending process {process_id}", "error")
     
-    def _run_simulation(self):
-        """This method only runs if auto-generate processes is enabled"""
-        self._log_message("Auto-generating processes...", "info")
-        while self.simulation_running and self.auto_generate_processes:
-            # Add random process only if auto-generate is enabled
-            self._add_random_process()
-            time.sleep(self.simulation_speed)
+    def _auto_tick(self):
+        """Add one random process, then reschedule while auto-generate is enabled"""
+        self._auto_tick_id = None
+        if not (self.simulation_running and self.auto_generate_processes):
+            return
+        self._add_random_process()
+        self._auto_tick_id = self.root.after(int(self.speed_var.get() * 1000), self._auto_tick)
     
-
     def _add_process(self):
         try:
             size = int(self.process_size_var.get())
@@ -293,69 +533,86 @@ class MemoryVisualizerGUI:
             # Check process ID
             if self.process_id_var.get():
                 process_id = int(self.process_id_var.get())
+                if process_id < 0:
+                    self._log_message("Process ID must not be negative", "error")
+                    return
                 # Check if process ID is already in use
                 if process_id in self.allocated_process_ids:
                     self._log_message(f"Process ID {process_id} is already in use", "error")
                     return
+                # Keep generated IDs ahead of every manually chosen one
+                self.process_generator.next_pid = max(self.process_generator.next_pid, process_id + 1)
             else:
                 # Generate a unique process ID
                 process_id = self._generate_unique_process_id()
 
-            method_str = self.allocation_method_var.get()
-            method = AllocationMethod.PAGING if method_str == "paging" else AllocationMethod.SEGMENTATION
+            method = self.allocation_method
 
             # Read lifetime for this process
             lifetime = float(self.process_lifetime_var.get())
             
             if self.simulation_running:
-                success = self.memory_manager.allocate_process(process_id, size, method)
-                if success:
-                    # Add process ID to allocated set
-                    self.allocated_process_ids.add(process_id)
-                    self._log_message(f"Process {process_id} added (size {size}, lifetime {lifetime}s)", "success")
-                    self._schedule_auto_removal(process_id, lifetime)
-                else:
-                    self._log_message(f"Failed to allocate process {process_id}", "error")
+                # Reserve the ID now, a second click must not pass the check
+                # before the worker has answered; a failed allocation releases it
+                self.allocated_process_ids.add(process_id)
+                on_done = functools.partial(self._on_process_allocated, self._generation, process_id, size, lifetime)
+                self.cmd_q.put(("alloc", process_id, size, method, on_done))
             else:
-                if not hasattr(self, 'pending_processes'):
-                    self.pending_processes = []
-                
                 # Check for duplicate process ID in pending queue
-                if any(process[0] == process_id for process in self.pending_processes):
+                if process_id in self._pending_pids:
                     self._log_message(f"Process ID {process_id} is already in pending queue", "error")
                     return
                 
                 self.pending_processes.append((process_id, size, method, lifetime))
+                self._pending_pids.add(process_id)
                 self._log_message(f"Process {process_id} added to pending queue (size {size}, lifetime {lifetime}s)", "info")
 
         except ValueError:
             self._log_message("Invalid input values", "error")
+    
+    def _on_process_allocated(self, generation, process_id, size, lifetime, success):
+        if generation != self._generation:
+            return
+        if success:
+            self._log_message(f"Process {process_id} added (size {size}, lifetime {lifetime}s)", "success")
+            self._schedule_auto_removal(process_id, lifetime)
+        else:
+            self.allocated_process_ids.discard(process_id)
+            self._log_message(f"Failed to allocate process {process_id}", "error")
 
     def _generate_unique_process_id(self):
         """Generate a unique process ID"""
-        while True:
-            process_id = self.process_generator.next_pid
-            self.process_generator.next_pid += 1
-            
-            # Check if ID is not in current allocated processes or pending processes
-            if process_id not in self.allocated_process_ids:
-                if not hasattr(self, 'pending_processes') or \
-                   not any(pending_process[0] == process_id for pending_process in self.pending_processes):
-                    return process_id
+        # next_pid is a cursor past every ID handed out or entered manually,
+        # so it never collides with an allocated or pending process
+        process_id = self.process_generator.next_pid
+        self.process_generator.next_pid += 1
+        return process_id
     
     def _add_random_process(self):
         if not self.simulation_running:
             self._log_message("Start simulation before adding processes", "error")
             return
             
+        try:
+            lifetime = float(self.process_lifetime_var.get())
+        except ValueError:
+            self._log_message("Invalid process lifetime", "error")
+            return
+        
         process_id, size = self.process_generator.generate_process()
-        method_str = self.allocation_method_var.get()
-        method = AllocationMethod.PAGING if method_str == "paging" else AllocationMethod.SEGMENTATION
-        success = self.memory_manager.allocate_process(process_id, size, method)
+        method = self.allocation_method
+        self.allocated_process_ids.add(process_id)
+        on_done = functools.partial(self._on_random_allocated, self._generation, process_id, size, lifetime)
+        self.cmd_q.put(("alloc", process_id, size, method, on_done))
+    
+    def _on_random_allocated(self, generation, process_id, size, lifetime, success):
+        if generation != self._generation:
+            return
         if success:
             self._log_message(f"Added random process {process_id} with size {size}", "success")
-            self._schedule_auto_removal(process_id)
+            self._schedule_auto_removal(process_id, lifetime)
         else:
+            self.allocated_process_ids.discard(process_id)
             self._log_message(f"Failed to allocate random process {process_id} with size {size}", "error")
     
     def _remove_process(self):
@@ -365,16 +622,21 @@ class MemoryVisualizerGUI:
             
         try:
             process_id = int(self.process_id_var.get())
-            success = self.memory_manager.deallocate_process(process_id)
-            if success:
-                # Remove process ID from allocated set
-                self.allocated_process_ids.discard(process_id)
-                self._log_message(f"Removed process {process_id}", "success")
-            else:
-                self._log_message(f"Failed to remove process {process_id}", "error")
+            on_done = functools.partial(self._on_process_removed, self._generation, process_id)
+            self.cmd_q.put(("free", process_id, on_done))
         except ValueError:
             self._log_message("Invalid process ID", "error")
     
+    def _on_process_removed(self, generation, process_id, success):
+        if generation != self._generation:
+            return
+        if success:
+            # Remove process ID from allocated set
+            self.allocated_process_ids.discard(process_id)
+            self._log_message(f"Removed process {process_id}", "success")
+        else:
+            self._log_message(f"Failed to remove process {process_id}", "error")
+    
     def _apply_settings(self):
         try:
             new_memory_size = int(self.memory_size_var.get())
@@ -395,23 +657,59 @@ class MemoryVisualizerGUI:
     def _reset_simulation(self):
         if self.simulation_running:
             self._toggle_simulation()
-        self.memory_manager = MemoryManager(self.memory_size, self.page_size)
-        self.process_generator.next_pid = 1
+        # Expiries scheduled for the old memory must not hit reused process IDs.
+        # The expiry thread queues its frees under the same lock, so each one
+        # lands either before the reset or not at all.
+        with self._expiry_lock:
+            self._generation += 1
+            self.cmd_q.put(("reset", self.memory_size, self.page_size, None))
+            self._expiry_heap.clear()
+        # Pending processes survive a reset, so restart IDs after them
+        self.process_generator.next_pid = max(self._pending_pids, default=0) + 1
         # Clear the set of allocated process IDs
         self.allocated_process_ids.clear()
         self._log_message("Simulation reset", "info")
     
     def _schedule_auto_removal(self, process_id, lifetime):
-        timer = threading.Timer(lifetime, self._auto_remove_process, args=(process_id,))
-        timer.daemon = True
-        timer.start()
-
+        with self._expiry_lock:
+            heapq.heappush(self._expiry_heap, (time.monotonic() + lifetime, self._generation, process_id))
+        self._expiry_evt.set()
     
-    def _auto_remove_process(self, process_id):
+    def _expiry_loop(self):
+        """Expiry thread: sleep until the earliest deadline, or until woken by a new one"""
+        while True:
+            with self._expiry_lock:
+                deadline = self._expiry_heap[0][0] if self._expiry_heap else None
+            if deadline is None:
+                self._expiry_evt.wait()
+            else:
+                self._expiry_evt.wait(timeout=max(0, deadline - time.monotonic()))
+            self._expiry_evt.clear()
+            
+            now = time.monotonic()
+            expired = []
+            with self._expiry_lock:
+                while self._expiry_heap and self._expiry_heap[0][0] <= now:
+                    _, generation, process_id = heapq.heappop(self._expiry_heap)
+                    if generation == self._generation:
+                        expired.append(process_id)
+                if expired:
+                    self._auto_remove_processes(expired)
+    
+    def _auto_remove_processes(self, process_ids):
+        # Runs on the expiry thread: only enqueue work, the result is logged
+        # back on the Tk thread through _gui_call. Processes expiring together
+        # are freed as one batch.
         # Only try to remove if simulation is still running
         if self.simulation_running:
-            removed = self.memory_manager.deallocate_process(process_id)
-            if removed:
+            on_done = functools.partial(self._on_processes_expired, self._generation, process_ids)
+            self.cmd_q.put(("free_batch", process_ids, on_done))
+    
+    def _on_processes_expired(self, generation, process_ids, results):
+        if generation != self._generation:
+            return
+        for process_id, success in zip(process_ids, results):
+            if success:
                 # Remove process ID from allocated set
                 self.allocated_process_ids.discard(process_id)
                 self._log_message(f"Automatically removed process {process_id} after lifetime expiration", "info")
@@ -1,5 +1,6 @@
 # main.py
 
+import argparse
 import tkinter as tk
 from gui import MemoryVisualizerGUI
 
@@ -8,8 +9,13 @@ def main():
     Main entry point for the memory visualization application.
     Initializes the Tkinter root window and creates the GUI.
     """
+    parser = argparse.ArgumentParser(description="Memory allocation visualizer")
+    parser.add_argument("--renderer", choices=("matplotlib", "tk"), default="matplotlib",
+                        help="draw with matplotlib (default) or directly on a Tk canvas")
+    args = parser.parse_args()
+    
     root = tk.Tk()
-    app = MemoryVisualizerGUI(root)
+    app = MemoryVisualizerGUI(root, renderer=args.renderer)
     root.protocol("WM_DELETE_WINDOW", on_close)
     root.mainloop()
 
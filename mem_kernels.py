@@ -0,0 +1,53 @@
+# mem_kernels.py
+# Array kernels behind MemoryManager's hot paths. They are compiled with
+# numba when it is installed and fall back to plain numpy otherwise.
+
+import numpy as np
+
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+HAVE_NUMBA = njit is not None
+
+
+def _frame_runs_numpy(frame_pid):
+    if frame_pid.size == 0:
+        return frame_pid.copy(), frame_pid.copy(), frame_pid.copy()
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(frame_pid)) + 1))
+    ends = np.append(starts[1:], frame_pid.size)
+    return starts, ends, frame_pid[starts]
+
+
+if HAVE_NUMBA:
+    @njit(cache=True)
+    def _frame_runs(frame_pid):
+        n = frame_pid.size
+        starts = np.empty(n, dtype=np.int64)
+        owners = np.empty(n, dtype=np.int64)
+        count = 0
+        for i in range(n):
+            if i == 0 or frame_pid[i] != frame_pid[i - 1]:
+                starts[count] = i
+                owners[count] = frame_pid[i]
+                count += 1
+        ends = np.empty(count, dtype=np.int64)
+        for j in range(count - 1):
+            ends[j] = starts[j + 1]
+        if count:
+            ends[count - 1] = n
+        return starts[:count], ends, owners[:count]
+else:
+    _frame_runs = _frame_runs_numpy
+
+
+def update_memory_from_frame_pid(frame_pid, page_size):
+    """Run-length encode frame_pid into memory blocks.
+
+    Returns (starts, ends, sizes, pids) arrays with one entry per run of
+    frames owned by the same process, addresses in bytes and ends inclusive.
+    """
+    start_frames, end_frames, pids = _frame_runs(frame_pid)
+    return (start_frames * page_size, end_frames * page_size - 1,
+            (end_frames - start_frames) * page_size, pids)
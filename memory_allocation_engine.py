@@ -1,11 +1,28 @@
 from enum import Enum, auto
+import bisect
+from collections import deque
+from itertools import islice
+from operator import itemgetter
 import time
+from types import MappingProxyType
 from typing import Dict, List, Optional, Tuple
-import random
+import numpy as np
+from mem_kernels import update_memory_from_frame_pid
+
+# frame_pid value of a frame that no process owns
+FREE_FRAME = -1
+
+# Sort key of the address-ordered memory block list
+_block_start = itemgetter('start')
+
+# Row layout of memory snapshots; process_id is FREE_FRAME for free blocks
+MEMORY_DTYPE = np.dtype([('start', np.int64), ('end', np.int64), ('size', np.int64), ('process_id', np.int64)])
+
 # Define the AllocationMethod enum
 class AllocationMethod(Enum):
     PAGING = auto()
     SEGMENTATION = auto()
+    BUDDY = auto()
 
 # Memory Manager class
 class MemoryManager:
@@ -14,11 +31,39 @@ class MemoryManager:
         self.memory_size = memory_size
         self.page_size = page_size
         self.memory = [{'start': 0, 'end': memory_size - 1, 'size': memory_size, 'process_id': None}]
-        self.page_table = [{'frame_id': i, 'process_id': None, 'start_address': i * page_size, 
-                           'end_address': (i + 1) * page_size - 1} 
-                          for i in range(memory_size // page_size)]
+        # Sorted start addresses of the free blocks in self.memory
+        self._free_starts = [0]
+        # Buddy system: free_lists[k] holds the addresses of free 2**k blocks.
+        # Only the largest power of two that fits in memory is managed.
+        self.max_order = memory_size.bit_length() - 1
+        self.free_lists = [set() for _ in range(self.max_order + 1)]
+        self.free_lists[self.max_order].add(0)
+        # Running total over allocated_processes, kept current on every
+        # allocation/deallocation so stats never have to walk the processes
+        self._internal_fragmentation = 0
+        # Page table as a flat array indexed by frame id: the owning process
+        # id, or FREE_FRAME. Free frames are simply frame_pid == FREE_FRAME.
+        self.frame_pid = np.full(memory_size // page_size, FREE_FRAME, dtype=np.int64)
         self.allocated_processes = {}
-        self.recent_events = []
+        # Allocation routine per method, looked up once per request
+        self._alloc_dispatch = {
+            AllocationMethod.PAGING: self._allocate_process_paging,
+            AllocationMethod.SEGMENTATION: self._allocate_process_segmentation,
+            AllocationMethod.BUDDY: self._allocate_process_buddy
+        }
+        self.recent_events = deque(maxlen=10)
+        # Bumped on every successful allocation/deallocation so observers can
+        # cheaply tell whether anything changed since they last looked.
+        self.version = 0
+        # Derived state is brought up to date only when read:
+        # _map_stale: paging frames changed but self.memory not rebuilt yet.
+        # _stats_dirty: the running totals moved since stats were computed.
+        self._map_stale = False
+        self._stats_dirty = False
+        # Read-only snapshots as last handed out; dropped on every change and
+        # rebuilt on the next request, never modified in place
+        self._memory_snapshot = None
+        self._page_table_snapshot = None
         self.stats = {
             'total_memory': memory_size,
             'used_memory': 0,
@@ -29,52 +74,132 @@ class MemoryManager:
             'external_fragmentation': 0,
             'internal_fragmentation': 0
         }
+        # self.stats is replaced, never mutated, so one read-only view per
+        # stats dict can be handed out as is
+        self._stats_view = MappingProxyType(self.stats)
+        # Trailing events as last returned, and the event count they reflect
+        self._event_count = 0
+        self._recent_events_view = ()
+        self._recent_events_count = 0
     
     def get_memory_snapshot(self):
-        return self.memory.copy()
+        """Return the memory map as a read-only MEMORY_DTYPE array, one row per block"""
+        if self._memory_snapshot is None:
+            self._sync_memory()
+            snapshot = np.empty(len(self.memory), dtype=MEMORY_DTYPE)
+            snapshot['start'] = [block['start'] for block in self.memory]
+            snapshot['end'] = [block['end'] for block in self.memory]
+            snapshot['size'] = [block['size'] for block in self.memory]
+            snapshot['process_id'] = [FREE_FRAME if block['process_id'] is None else block['process_id']
+                                      for block in self.memory]
+            snapshot.flags.writeable = False
+            self._memory_snapshot = snapshot
+        return self._memory_snapshot
     
     def get_page_table_snapshot(self):
-        return self.page_table.copy()
+        """Return the owning process id of every frame (FREE_FRAME if none) as a
+        read-only array indexed by frame id. A frame's addresses follow from
+        frame_id * page_size."""
+        if self._page_table_snapshot is None:
+            snapshot = self.frame_pid.copy()
+            snapshot.flags.writeable = False
+            self._page_table_snapshot = snapshot
+        return self._page_table_snapshot
     
     def get_memory_stats(self):
-        return self.stats.copy()
+        if self._stats_dirty:
+            self._update_stats()
+        return self._stats_view
     
     def get_recent_events(self):
-        return self.recent_events[-5:] if self.recent_events else []
+        if self._recent_events_count != self._event_count:
+            self._recent_events_view = tuple(islice(self.recent_events, max(0, len(self.recent_events) - 5), None))
+            self._recent_events_count = self._event_count
+        return self._recent_events_view
     
     def allocate_process(self, process_id, size, method):
-        if method == AllocationMethod.PAGING:
-            return self._allocate_process_paging(process_id, size)
-        else:
-            return self._allocate_process_segmentation(process_id, size)
+        success = self._allocate(process_id, size, method)
+        if success:
+            self.version += 1
+        return success
+    
+    def allocate_batch(self, requests):
+        """Allocate a list of (process_id, size, method) requests in one pass.
+        
+        Requests are placed largest first (first-fit decreasing), which packs
+        segments with less external fragmentation than arrival order.
+        Returns one success flag per request, in the order given.
+        """
+        results = [False] * len(requests)
+        order = sorted(range(len(requests)), key=lambda i: requests[i][1], reverse=True)
+        for i in order:
+            process_id, size, method = requests[i]
+            results[i] = self._allocate(process_id, size, method)
+        if any(results):
+            self.version += 1
+        return results
+    
+    def _allocate(self, process_id, size, method):
+        if process_id < 0:
+            # Negative ids would collide with FREE_FRAME in frame_pid and snapshots
+            self._log_event(process_id, "Allocation Failed", "Process ID must not be negative")
+            return False
+        if process_id in self.allocated_processes:
+            # Replacing the entry would leak the memory the process already holds
+            self._log_event(process_id, "Allocation Failed", "Process ID is already allocated")
+            return False
+        success = self._alloc_dispatch[method](process_id, size)
+        if success:
+            self._account(self.allocated_processes[process_id], 1)
+        return success
+    
+    def _held_size(self, info):
+        """Memory actually reserved for a process, including any rounding up"""
+        if info['method'] == 'paging':
+            return len(info['frames']) * self.page_size
+        elif info['method'] == 'buddy':
+            return 1 << info['order']
+        return info['size']
+    
+    def _account(self, info, sign):
+        # sign is 1 when the process is allocated and -1 when it is released
+        held = self._held_size(info)
+        self._internal_fragmentation += sign * (held - info['size'])
+        # Every allocation and release passes through here
+        self._stats_dirty = True
+        self._memory_snapshot = None
+        self._page_table_snapshot = None
     
     def _allocate_process_paging(self, process_id, size):
         pages_needed = (size + self.page_size - 1) // self.page_size
-        free_frames = [frame for frame in self.page_table if frame['process_id'] is None]
+        free_frames = np.flatnonzero(self.frame_pid == FREE_FRAME)
         
-        if len(free_frames) < pages_needed:
-            self._log_event(process_id, "Allocation Failed", f"Not enough free frames. Needed {pages_needed}, available {len(free_frames)}")
+        if free_frames.size < pages_needed:
+            self._log_event(process_id, "Allocation Failed", f"Not enough free frames. Needed {pages_needed}, available {free_frames.size}")
             return False
         
         allocated_frames = free_frames[:pages_needed]
-        for frame in allocated_frames:
-            frame['process_id'] = process_id
+        self.frame_pid[allocated_frames] = process_id
         
-        self._update_memory_from_page_table()
+        self._map_stale = True
         self.allocated_processes[process_id] = {
             'size': size,
-            'frames': [frame['frame_id'] for frame in allocated_frames],
+            'frames': allocated_frames,
             'method': 'paging'
         }
-        self._update_stats()
         self._log_event(process_id, "Allocation", f"Allocated {pages_needed} pages for size {size}")
         return True
     
     def _allocate_process_segmentation(self, process_id, size):
-        for i, block in enumerate(self.memory):
-            if block['process_id'] is None and block['size'] >= size:
+        self._sync_memory()
+        # First fit, visiting only the free blocks in address order
+        for j, free_start in enumerate(self._free_starts):
+            i = self._block_index(free_start)
+            block = self.memory[i]
+            if block['size'] >= size:
                 if block['size'] == size:
                     block['process_id'] = process_id
+                    del self._free_starts[j]
                 else:
                     end_addr = block['start'] + size - 1
                     new_block = {
@@ -87,12 +212,12 @@ class MemoryManager:
                     block['size'] = size
                     block['process_id'] = process_id
                     self.memory.insert(i + 1, new_block)
+                    # The remainder keeps the block's place in the free order
+                    self._free_starts[j] = new_block['start']
                 
                 start_page = block['start'] // self.page_size
                 end_page = block['end'] // self.page_size
-                for frame in self.page_table:
-                    if start_page <= frame['frame_id'] <= end_page:
-                        frame['process_id'] = process_id
+                self.frame_pid[start_page:end_page + 1] = process_id
                 
                 self.allocated_processes[process_id] = {
                     'size': size,
@@ -100,89 +225,211 @@ class MemoryManager:
                     'end': block['end'],
                     'method': 'segmentation'
                 }
-                self._update_stats()
                 self._log_event(process_id, "Allocation", f"Allocated segment of size {size} at address {block['start']}")
                 return True
         
         self._log_event(process_id, "Allocation Failed", f"No suitable free block found for size {size}")
         return False
     
+    def _allocate_process_buddy(self, process_id, size):
+        self._sync_memory()
+        order = (size - 1).bit_length()
+        found = self._find_buddy(order)
+        if found is None:
+            self._log_event(process_id, "Allocation Failed", f"No free buddy block of size {1 << order} for size {size}")
+            return False
+        
+        # Halve the free block down to the requested order, returning the half
+        # that does not hold target to the free list one order below
+        k, addr, target = found
+        self.free_lists[k].remove(addr)
+        while k > order:
+            k -= 1
+            self.free_lists[k].add((target & ~((1 << k) - 1)) ^ (1 << k))
+        
+        block = self._carve_block(target, 1 << order, process_id)
+        start_page = block['start'] // self.page_size
+        end_page = block['end'] // self.page_size
+        self.frame_pid[start_page:end_page + 1] = process_id
+        
+        self.allocated_processes[process_id] = {
+            'size': size,
+            'start': block['start'],
+            'end': block['end'],
+            'order': order,
+            'method': 'buddy'
+        }
+        self._log_event(process_id, "Allocation", f"Allocated buddy block of size {block['size']} for size {size} at address {block['start']}")
+        return True
+    
     def deallocate_process(self, process_id):
+        if not self._deallocate(process_id):
+            return False
+        self.version += 1
+        return True
+    
+    def deallocate_processes(self, process_ids):
+        """Free several processes in one pass, bumping version once.
+        
+        Returns one success flag per process id, in the order given.
+        """
+        results = [self._deallocate(process_id) for process_id in process_ids]
+        if any(results):
+            self.version += 1
+        return results
+    
+    def _deallocate(self, process_id):
         if process_id not in self.allocated_processes:
             return False
         
         process_info = self.allocated_processes[process_id]
         
         if process_info['method'] == 'paging':
-            for frame_id in process_info['frames']:
-                for frame in self.page_table:
-                    if frame['frame_id'] == frame_id:
-                        frame['process_id'] = None
-            self._update_memory_from_page_table()
+            self.frame_pid[process_info['frames']] = FREE_FRAME
+            self._map_stale = True
         else:
-            for block in self.memory:
-                if block['process_id'] == process_id:
-                    block['process_id'] = None
-                    start_page = block['start'] // self.page_size
-                    end_page = block['end'] // self.page_size
-                    for frame in self.page_table:
-                        if start_page <= frame['frame_id'] <= end_page:
-                            frame['process_id'] = None
-                    break
-            self._merge_free_blocks()
+            self._sync_memory()
+            i = self._find_block(process_id, process_info['start'])
+            if i is not None:
+                block = self.memory[i]
+                start_page = block['start'] // self.page_size
+                end_page = block['end'] // self.page_size
+                self.frame_pid[start_page:end_page + 1] = FREE_FRAME
+                self._release_block(i)
+            if process_info['method'] == 'buddy':
+                self._free_buddy(process_info['start'], process_info['order'])
         
+        self._account(process_info, -1)
         del self.allocated_processes[process_id]
-        self._update_stats()
         self._log_event(process_id, "Deallocation", "Process removed from memory")
         return True
     
+    def _sync_memory(self):
+        if self._map_stale:
+            self._update_memory_from_page_table()
+    
     def _update_memory_from_page_table(self):
-        self.memory = []
-        current_block = None
-        for frame in sorted(self.page_table, key=lambda x: x['frame_id']):
-            start_addr = frame['start_address']
-            end_addr = frame['end_address']
-            process_id = frame['process_id']
-            if current_block is None or current_block['process_id'] != process_id:
-                if current_block is not None:
-                    self.memory.append(current_block)
-                current_block = {
-                    'start': start_addr,
-                    'end': end_addr,
-                    'size': end_addr - start_addr + 1,
-                    'process_id': process_id
-                }
-            else:
-                current_block['end'] = end_addr
-                current_block['size'] = current_block['end'] - current_block['start'] + 1
-        if current_block is not None:
-            self.memory.append(current_block)
-    
-    def _merge_free_blocks(self):
-        i = 0
-        while i < len(self.memory) - 1:
-            if self.memory[i]['process_id'] is None and self.memory[i+1]['process_id'] is None:
-                self.memory[i]['end'] = self.memory[i+1]['end']
-                self.memory[i]['size'] += self.memory[i+1]['size']
-                self.memory.pop(i+1)
-            else:
-                i += 1
+        # Run-length encode frame_pid: every change of owner starts a new block
+        starts, ends, sizes, owners = update_memory_from_frame_pid(self.frame_pid, self.page_size)
+        self.memory = [{'start': start,
+                        'end': end,
+                        'size': size,
+                        'process_id': owner if owner != FREE_FRAME else None}
+                       for start, end, size, owner in zip(starts.tolist(), ends.tolist(),
+                                                          sizes.tolist(), owners.tolist())]
+        self._free_starts = [block['start'] for block in self.memory if block['process_id'] is None]
+        self._map_stale = False
+    
+    def _find_buddy(self, order):
+        """Return (k, addr, target): free_lists[k] block addr holding the free
+        2**order block at target, smallest k and lowest address first, or None.
+        
+        Segmentation and paging place memory without consulting free_lists,
+        so a listed block only counts where self.memory agrees it is free.
+        """
+        for k in range(order, self.max_order + 1):
+            free = self.free_lists[k]
+            if not free:
+                continue
+            # With buddy allocation alone the lowest entry is always usable
+            addr = min(free)
+            target = self._buddy_fit(addr, k, order)
+            if target is not None:
+                return k, addr, target
+            # It is partly held by another method; try the rest in address order
+            for addr in sorted(free)[1:]:
+                target = self._buddy_fit(addr, k, order)
+                if target is not None:
+                    return k, addr, target
+        return None
+    
+    def _buddy_fit(self, addr, k, order):
+        """Lowest wholly free 2**order block inside the 2**k block at addr, or None"""
+        block = self.memory[bisect.bisect_right(self.memory, addr, key=_block_start) - 1]
+        if block['end'] >= addr + (1 << k) - 1:
+            # One block covers all of it, so it is either all free or all taken
+            return addr if block['process_id'] is None else None
+        if k == order:
+            return None
+        lower = self._buddy_fit(addr, k - 1, order)
+        return lower if lower is not None else self._buddy_fit(addr + (1 << (k - 1)), k - 1, order)
+    
+    def _free_buddy(self, addr, order):
+        # Merge with the buddy for as long as it is free at the same order
+        while order < self.max_order:
+            buddy = addr ^ (1 << order)
+            if buddy not in self.free_lists[order]:
+                break
+            self.free_lists[order].remove(buddy)
+            addr &= ~(1 << order)
+            order += 1
+        self.free_lists[order].add(addr)
+    
+    def _carve_block(self, start, size, process_id):
+        """Give [start, start + size) of the free block containing it to process_id"""
+        i = bisect.bisect_right(self.memory, start, key=_block_start) - 1
+        block = self.memory[i]
+        end = start + size - 1
+        if block['process_id'] is not None or end > block['end']:
+            raise ValueError(f"Addresses {start}-{end} are not inside a single free block")
+        allocated = {'start': start, 'end': end, 'size': size, 'process_id': process_id}
+        pieces = [allocated]
+        free_starts = []
+        if start > block['start']:
+            pieces.insert(0, {'start': block['start'], 'end': start - 1,
+                              'size': start - block['start'], 'process_id': None})
+            free_starts.append(block['start'])
+        if end < block['end']:
+            pieces.append({'start': end + 1, 'end': block['end'],
+                           'size': block['end'] - end, 'process_id': None})
+            free_starts.append(end + 1)
+        self.memory[i:i + 1] = pieces
+        j = bisect.bisect_left(self._free_starts, block['start'])
+        self._free_starts[j:j + 1] = free_starts
+        return allocated
+    
+    def _find_block(self, process_id, start):
+        """Index of the block process_id holds, looked up by its recorded start"""
+        i = self._block_index(start)
+        if i < len(self.memory) and self.memory[i]['start'] == start and self.memory[i]['process_id'] == process_id:
+            return i
+        # A paging rebuild recuts self.memory at page boundaries, which can
+        # move the start of a segment that shares a page, so fall back to a scan
+        return next((i for i, block in enumerate(self.memory) if block['process_id'] == process_id), None)
+    
+    def _block_index(self, start):
+        return bisect.bisect_left(self.memory, start, key=_block_start)
+    
+    def _release_block(self, i):
+        """Free self.memory[i], coalescing it with free neighbours right away"""
+        block = self.memory[i]
+        block['process_id'] = None
+        if i + 1 < len(self.memory) and self.memory[i + 1]['process_id'] is None:
+            next_block = self.memory.pop(i + 1)
+            block['end'] = next_block['end']
+            block['size'] += next_block['size']
+            del self._free_starts[bisect.bisect_left(self._free_starts, next_block['start'])]
+        if i > 0 and self.memory[i - 1]['process_id'] is None:
+            prev_block = self.memory[i - 1]
+            prev_block['end'] = block['end']
+            prev_block['size'] += block['size']
+            self.memory.pop(i)
+        else:
+            bisect.insort(self._free_starts, block['start'])
     
     def _update_stats(self):
-        used_memory = sum(block['size'] for block in self.memory if block['process_id'] is not None)
-        free_memory = self.memory_size - used_memory
-        free_blocks = [block for block in self.memory if block['process_id'] is None]
-        largest_free_block = max([block['size'] for block in free_blocks], default=0)
+        self._sync_memory()
+        # Used and free memory both come from the memory map, so they agree
+        # with largest_free_block even when allocation methods are mixed.
+        # Only the free blocks are visited, through the free index.
+        free_sizes = [self.memory[self._block_index(start)]['size'] for start in self._free_starts]
+        free_memory = sum(free_sizes)
+        used_memory = self.memory_size - free_memory
+        largest_free_block = max(free_sizes, default=0)
         external_fragmentation = 0
         if free_memory > 0:
             external_fragmentation = 1 - (largest_free_block / free_memory)
         
-        internal_fragmentation = 0
-        for process_id, info in self.allocated_processes.items():
-            if info['method'] == 'paging':
-                allocated_size = len(info['frames']) * self.page_size
-                internal_fragmentation += allocated_size - info['size']
-        
         self.stats = {
             'total_memory': self.memory_size,
             'used_memory': used_memory,
@@ -191,8 +438,10 @@ class MemoryManager:
             'process_count': len(self.allocated_processes),
             'page_faults': 0,
             'external_fragmentation': external_fragmentation,
-            'internal_fragmentation': internal_fragmentation
+            'internal_fragmentation': self._internal_fragmentation
         }
+        self._stats_view = MappingProxyType(self.stats)
+        self._stats_dirty = False
     
     def _log_event(self, process_id, event_type, details):
         event = {
@@ -202,20 +451,38 @@ class MemoryManager:
             'details': details
         }
         self.recent_events.append(event)
-        if len(self.recent_events) > 10:
-            self.recent_events.pop(0)
+        self._event_count += 1
     
 
 # Process Generator
 class ProcessGenerator:
+    # Sizes are drawn from numpy in blocks of this many and handed out one by one
+    SIZE_BUFFER_LEN = 1024
+    
     def __init__(self, min_size, max_size):
         self.min_size = min_size
         self.max_size = max_size
         self.next_pid = 1
+        self._rng = np.random.default_rng()
+        self._refill_sizes()
+    
+    def _refill_sizes(self):
+        self._size_buf = self._rng.integers(self.min_size, self.max_size + 1, self.SIZE_BUFFER_LEN).tolist()
+        self._idx = 0
     
     def generate_process(self):
         process_id = self.next_pid
         self.next_pid += 1
-        size = random.randint(self.min_size, self.max_size)
+        size = self._size_buf[self._idx]
+        self._idx += 1
+        if self._idx == self.SIZE_BUFFER_LEN:
+            self._refill_sizes()
         return process_id, size
     
+    def generate_processes(self, n):
+        """Generate n processes at once, returned as (process_ids, sizes) numpy arrays"""
+        sizes = self._rng.integers(self.min_size, self.max_size + 1, size=n)
+        process_ids = np.arange(self.next_pid, self.next_pid + n)
+        self.next_pid += n
+        return process_ids, sizes
+    
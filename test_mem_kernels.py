@@ -0,0 +1,63 @@
+import unittest
+
+import numpy as np
+
+import mem_kernels
+
+
+def _reference_runs(frame_pid):
+    starts, ends, owners = [], [], []
+    for frame_id, owner in enumerate(frame_pid.tolist()):
+        if not owners or owner != owners[-1]:
+            if owners:
+                ends.append(frame_id)
+            starts.append(frame_id)
+            owners.append(owner)
+    if owners:
+        ends.append(frame_pid.size)
+    return starts, ends, owners
+
+
+def _frame_pid_cases():
+    rng = np.random.default_rng(0)
+    cases = [
+        np.empty(0, dtype=np.int64),
+        np.full(64, -1, dtype=np.int64),
+        np.full(64, 3, dtype=np.int64),
+        np.array([5], dtype=np.int64),
+        np.tile(np.array([-1, 1], dtype=np.int64), 32),
+        np.arange(-1, 63, dtype=np.int64),
+    ]
+    cases += [rng.integers(-1, 4, size=n) for n in (1, 2, 17, 256, 4096)]
+    return cases
+
+
+class FrameRunsTest(unittest.TestCase):
+
+    def assertRunsEqual(self, runs, expected):
+        for array, values in zip(runs, expected):
+            self.assertEqual(array.tolist(), list(values))
+
+    def test_numpy_matches_reference(self):
+        for frame_pid in _frame_pid_cases():
+            self.assertRunsEqual(mem_kernels._frame_runs_numpy(frame_pid), _reference_runs(frame_pid))
+
+    @unittest.skipUnless(mem_kernels.HAVE_NUMBA, "numba is not installed")
+    def test_numba_matches_numpy(self):
+        for frame_pid in _frame_pid_cases():
+            runs = mem_kernels._frame_runs(frame_pid)
+            for array, expected in zip(runs, mem_kernels._frame_runs_numpy(frame_pid)):
+                self.assertEqual(array.dtype, expected.dtype)
+                self.assertEqual(array.tolist(), expected.tolist())
+
+    def test_update_memory_from_frame_pid(self):
+        frame_pid = np.array([-1, -1, 2, 2, 2, -1, 7], dtype=np.int64)
+        starts, ends, sizes, pids = mem_kernels.update_memory_from_frame_pid(frame_pid, 16)
+        self.assertEqual(starts.tolist(), [0, 32, 80, 96])
+        self.assertEqual(ends.tolist(), [31, 79, 95, 111])
+        self.assertEqual(sizes.tolist(), [32, 48, 16, 16])
+        self.assertEqual(pids.tolist(), [-1, 2, -1, 7])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,142 @@
+import random
+import unittest
+
+from memory_allocation_engine import MemoryManager, AllocationMethod, ProcessGenerator, FREE_FRAME
+
+
+class MixedMethodTest(unittest.TestCase):
+    """The allocation method can be switched while processes are still live"""
+
+    def assertConsistent(self, mm):
+        blocks = mm.get_memory_snapshot().tolist()
+        position = 0
+        for start, end, size, process_id in blocks:
+            self.assertEqual(start, position)
+            self.assertEqual(size, end - start + 1)
+            position = end + 1
+        self.assertEqual(position, mm.memory_size)
+        for left, right in zip(blocks, blocks[1:]):
+            self.assertFalse(left[3] == right[3] == FREE_FRAME, "adjacent free blocks were not merged")
+        owners = {process_id for *_, process_id in blocks} - {FREE_FRAME}
+        self.assertEqual(owners, set(mm.allocated_processes))
+
+    def test_buddy_after_segmentation(self):
+        mm = MemoryManager(256, 16)
+        self.assertTrue(mm.allocate_process(1, 32, AllocationMethod.SEGMENTATION))
+        self.assertTrue(mm.allocate_process(2, 32, AllocationMethod.BUDDY))
+        self.assertEqual(mm.get_memory_snapshot().tolist()[:2], [(0, 31, 32, 1), (32, 63, 32, 2)])
+        self.assertConsistent(mm)
+
+    def test_buddy_after_paging(self):
+        mm = MemoryManager(256, 16)
+        self.assertTrue(mm.allocate_process(1, 64, AllocationMethod.PAGING))
+        self.assertTrue(mm.allocate_process(2, 32, AllocationMethod.BUDDY))
+        self.assertEqual(mm.get_memory_snapshot().tolist()[:2], [(0, 63, 64, 1), (64, 95, 32, 2)])
+        self.assertConsistent(mm)
+
+    def test_segment_freed_after_paging_rebuild(self):
+        # The paging rebuild recuts pid 4's segment (start 116) at page 112
+        mm = MemoryManager(256, 16)
+        mm.allocate_process(1, 8, AllocationMethod.PAGING)
+        mm.allocate_process(2, 100, AllocationMethod.SEGMENTATION)
+        mm.allocate_process(4, 10, AllocationMethod.SEGMENTATION)
+        mm.allocate_process(5, 16, AllocationMethod.PAGING)
+        self.assertTrue(mm.deallocate_process(4))
+        self.assertIn((128, 143, 16, 5), mm.get_memory_snapshot().tolist())
+        self.assertConsistent(mm)
+
+    def test_last_segment_freed_after_paging_rebuild(self):
+        mm = MemoryManager(256, 16)
+        mm.allocate_process(1, 250, AllocationMethod.SEGMENTATION)
+        mm.allocate_process(2, 6, AllocationMethod.SEGMENTATION)
+        mm.deallocate_process(1)
+        mm.allocate_process(3, 16, AllocationMethod.PAGING)
+        self.assertTrue(mm.deallocate_process(2))
+        self.assertEqual(mm.get_memory_snapshot().tolist(), [(0, 15, 16, 3), (16, 255, 240, FREE_FRAME)])
+        self.assertConsistent(mm)
+
+    def test_stats_follow_memory_map(self):
+        # The paging rebuild widens the 10 unit segment to its whole page
+        mm = MemoryManager(256, 16)
+        mm.allocate_process(1, 10, AllocationMethod.SEGMENTATION)
+        mm.allocate_process(2, 16, AllocationMethod.PAGING)
+        stats = mm.get_memory_stats()
+        self.assertEqual(stats['used_memory'], 32)
+        self.assertEqual(stats['free_memory'], 224)
+        self.assertEqual(stats['external_fragmentation'], 0)
+
+    def test_random_segmentation_and_buddy(self):
+        methods = (AllocationMethod.SEGMENTATION, AllocationMethod.BUDDY)
+        for seed in range(50):
+            rng = random.Random(seed)
+            mm = MemoryManager(256, 16)
+            live = []
+            for process_id in range(1, 200):
+                if live and rng.random() < 0.45:
+                    self.assertTrue(mm.deallocate_process(live.pop(rng.randrange(len(live)))))
+                elif mm.allocate_process(process_id, rng.randint(1, 64), rng.choice(methods)):
+                    live.append(process_id)
+                self.assertConsistent(mm)
+
+
+class ProcessIdTest(unittest.TestCase):
+
+    def test_negative_process_id_is_rejected(self):
+        for method in AllocationMethod:
+            mm = MemoryManager(256, 16)
+            self.assertFalse(mm.allocate_process(-1, 64, method))
+            self.assertEqual(mm.allocate_batch([(-1, 64, method)]), [False])
+            self.assertEqual(mm.allocated_processes, {})
+            self.assertTrue((mm.frame_pid == FREE_FRAME).all())
+            self.assertTrue(mm.allocate_process(2, 64, method))
+            self.assertEqual(mm.get_memory_stats()['used_memory'], 64)
+
+    def test_allocated_process_id_is_rejected(self):
+        for method in AllocationMethod:
+            mm = MemoryManager(256, 16)
+            self.assertTrue(mm.allocate_process(7, 64, method))
+            self.assertFalse(mm.allocate_process(7, 64, method))
+            self.assertEqual(mm.allocate_batch([(7, 16, method)]), [False])
+            self.assertTrue(mm.deallocate_process(7))
+            self.assertTrue((mm.frame_pid == FREE_FRAME).all())
+            self.assertEqual(mm.get_memory_stats()['process_count'], 0)
+
+
+class BatchTest(unittest.TestCase):
+
+    def test_allocate_batch_places_largest_first(self):
+        # In arrival order pids 1 and 2 would fit and leave no room for pid 3
+        mm = MemoryManager(256, 16)
+        requests = [(1, 16, AllocationMethod.SEGMENTATION),
+                    (2, 64, AllocationMethod.SEGMENTATION),
+                    (3, 200, AllocationMethod.SEGMENTATION),
+                    (4, 32, AllocationMethod.SEGMENTATION)]
+        self.assertEqual(mm.allocate_batch(requests), [True, False, True, True])
+        self.assertEqual(mm.get_memory_snapshot().tolist(),
+                         [(0, 199, 200, 3), (200, 231, 32, 4), (232, 247, 16, 1), (248, 255, 8, FREE_FRAME)])
+        self.assertEqual(mm.version, 1)
+
+    def test_deallocate_processes(self):
+        mm = MemoryManager(256, 16)
+        for process_id in (1, 2, 3):
+            mm.allocate_process(process_id, 64, AllocationMethod.PAGING)
+        version = mm.version
+        self.assertEqual(mm.deallocate_processes([3, 9, 1]), [True, False, True])
+        self.assertEqual(mm.version, version + 1)
+        self.assertEqual(set(mm.allocated_processes), {2})
+        self.assertEqual(mm.frame_pid.tolist(), [FREE_FRAME] * 4 + [2] * 4 + [FREE_FRAME] * 8)
+        self.assertEqual(mm.deallocate_processes([9]), [False])
+        self.assertEqual(mm.version, version + 1)
+
+    def test_generate_processes(self):
+        generator = ProcessGenerator(10, 20)
+        generator.generate_process()
+        process_ids, sizes = generator.generate_processes(500)
+        self.assertEqual(process_ids.tolist(), list(range(2, 502)))
+        self.assertTrue(((sizes >= 10) & (sizes <= 20)).all())
+        self.assertEqual(generator.next_pid, 502)
+        self.assertEqual(generator.generate_process()[0], 502)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,20 +1,62 @@
+import tkinter as tk
 import matplotlib.pyplot as plt
 import matplotlib.patches as patches
 import matplotlib.colors as mcolors
+from matplotlib.collections import PatchCollection
 import numpy as np
 
+# Process colors shared by the visualizers
+class ProcessColorTable:
+    # A process's color is _PALETTE[process_id % len(_PALETTE)]: fixed for
+    # the life of the process, with no per-process state to grow. Greys are
+    # left out so no process looks like free memory.
+    _PALETTE = np.array([mcolors.to_rgba(c) for cmap in (plt.cm.tab20, plt.cm.tab20b, plt.cm.tab20c)
+                         for c in cmap.colors if len(set(c)) > 1], dtype=np.float32)
+    _PALETTE_HEX = np.array([mcolors.to_hex(c) for c in _PALETTE])
+    _FREE_COLOR = np.array(mcolors.to_rgba('lightgrey'), dtype=np.float32)
+    _FREE_HEX = mcolors.to_hex(_FREE_COLOR)
+    
+    def lookup(self, pids):
+        """Return an (n, 4) RGBA array for an int array of process ids, negative meaning free memory"""
+        colors = self._PALETTE[pids % len(self._PALETTE)]
+        colors[pids < 0] = self._FREE_COLOR
+        return colors
+    
+    def lookup_hex(self, pids):
+        """Like lookup(), as '#rrggbb' strings for Tk"""
+        colors = self._PALETTE_HEX[pids % len(self._PALETTE_HEX)]
+        colors[pids < 0] = self._FREE_HEX
+        return colors.tolist()
+
 # Visualization class (Modified to integrate with tkinter)
 class MemoryVisualizer:
+    # Page-table grids with more frames than this are drawn without labels
+    MAX_LABELED_FRAMES = 64
+    
     def __init__(self):
         # Create matplotlib figure with two subplots
         self.fig, self.axes = plt.subplots(2, 1, figsize=(12, 8))
         self.fig.tight_layout(pad=3.0)
-        self.process_colors = {}
-        self.color_cycle = iter(mcolors.TABLEAU_COLORS)
+        self.colors = ProcessColorTable()
         
-        # Cache for optimization
+        # Artists currently shown in each axes, in drawing order
         self.memory_patches = []
         self.page_table_patches = []
+        # Pools of artists reused across updates; unused ones are hidden
+        self._memory_rects = []
+        self._memory_labels = []
+        self._address_labels = []
+        self._table_rects = []
+        self._table_labels = []
+        # Paging grid: one PatchCollection for every frame, rebuilt only when
+        # the number of frames changes
+        self._frame_grid = None
+        self._frame_grid_len = 0
+        
+        # Blitting state: every pooled patch/text is animated, so a full draw
+        # only renders the static axes and the result is cached in _bg
+        self.canvas = None
+        self._bg = None
         
         # Memory axes
         self.memory_ax = self.axes[0]
@@ -36,122 +78,310 @@ class MemoryVisualizer:
         """Return the matplotlib figure for embedding in tkinter"""
         return self.fig
     
-    def _get_process_color(self, process_id):
-        if process_id is None:
-            return 'lightgrey'
-        if process_id not in self.process_colors:
-            try:
-                self.process_colors[process_id] = next(self.color_cycle)
-            except StopIteration:
-                self.process_colors[process_id] = mcolors.to_hex(np.random.rand(3,))
-        return self.process_colors[process_id]
+    def attach_canvas(self, canvas):
+        """Blit onto the given Agg canvas, recapturing the background on every full draw"""
+        self.canvas = canvas
+        canvas.mpl_connect('draw_event', self._on_draw)
+    
+    def _on_draw(self, event):
+        self._bg = self.canvas.copy_from_bbox(self.fig.bbox)
+        self._draw_dynamic_artists()
+    
+    def _draw_dynamic_artists(self):
+        for artist in self.memory_patches:
+            self.memory_ax.draw_artist(artist)
+        for artist in self.page_table_patches:
+            self.table_ax.draw_artist(artist)
+    
+    def blit(self):
+        """Redraw only the dynamic artists over the cached static background"""
+        if self._bg is None:
+            self.canvas.draw()
+            return
+        self.canvas.restore_region(self._bg)
+        self._draw_dynamic_artists()
+        self.canvas.blit(self.fig.bbox)
+    
+    def _take(self, pool, count, factory):
+        """Return count artists from pool, creating any missing ones and hiding the rest"""
+        while len(pool) < count:
+            pool.append(factory())
+        for artist in pool[count:]:
+            artist.set_visible(False)
+        used = pool[:count]
+        for artist in used:
+            artist.set_visible(True)
+        return used
+    
+    def _new_rect(self, ax):
+        return ax.add_patch(patches.Rectangle((0, 0), 0, 0, edgecolor='black', linewidth=1, animated=True))
+    
+    def _new_label(self, ax):
+        return ax.text(0, 0, '', ha='center', va='center', fontsize=8, animated=True)
+    
+    def _new_address_label(self):
+        return self.memory_ax.text(0, 0, '', ha='center', va='top', fontsize=6, rotation=90, animated=True)
 
     def update_memory_view(self, memory_snapshot, total_memory_size):
-        for patch in self.memory_patches:
-            patch.remove()
-        self.memory_patches = []
-        
         height = 0.6
         y_pos = 0.2
         
-        for block in memory_snapshot:
-            start_pct = block['start'] / total_memory_size
-            width_pct = block['size'] / total_memory_size
-            
-            color = self._get_process_color(block['process_id'])
-            rect = patches.Rectangle((start_pct, y_pos), width_pct, height, 
-                                       facecolor=color, edgecolor='black', linewidth=1)
-            self.memory_ax.add_patch(rect)
-            self.memory_patches.append(rect)
+        num_blocks = len(memory_snapshot)
+        rects = self._take(self._memory_rects, num_blocks, lambda: self._new_rect(self.memory_ax))
+        # One start address per block, plus the end address of the last block
+        addresses = self._take(self._address_labels, num_blocks + 1 if num_blocks else 0,
+                               self._new_address_label)
+        labels = []
+        pids = memory_snapshot['process_id']
+        colors = self.colors.lookup(pids)
+        starts = memory_snapshot['start'].tolist()
+        start_pcts = (memory_snapshot['start'] / total_memory_size).tolist()
+        width_pcts = (memory_snapshot['size'] / total_memory_size).tolist()
+        
+        for i, (start, start_pct, width_pct, pid) in enumerate(zip(starts, start_pcts, width_pcts, pids.tolist())):
+            rect = rects[i]
+            rect.set_bounds(start_pct, y_pos, width_pct, height)
+            rect.set_facecolor(colors[i])
             
-            if block['size'] / total_memory_size > 0.05:
-                text_x = start_pct + width_pct / 2
-                text_y = y_pos + height / 2
-                text = f"P{block['process_id']}" if block['process_id'] is not None else "Free"
-                text_obj = self.memory_ax.text(text_x, text_y, text, ha='center', va='center', fontsize=8)
-                self.memory_patches.append(text_obj)
+            if width_pct > 0.05:
+                text = f"P{pid}" if pid >= 0 else "Free"
+                labels.append((start_pct + width_pct / 2, y_pos + height / 2, text))
             
-            start_text = self.memory_ax.text(start_pct, y_pos - 0.05, f"{block['start']}", 
-                                             ha='center', va='top', fontsize=6, rotation=90)
-            self.memory_patches.append(start_text)
+            addresses[i].set_position((start_pct, y_pos - 0.05))
+            addresses[i].set_text(f"{start}")
             
-            if block == memory_snapshot[-1]:
-                end_text = self.memory_ax.text(start_pct + width_pct, y_pos - 0.05, f"{block['end']}", 
-                                               ha='center', va='top', fontsize=6, rotation=90)
-                self.memory_patches.append(end_text)
+            if i == num_blocks - 1:
+                addresses[i + 1].set_position((start_pct + width_pct, y_pos - 0.05))
+                addresses[i + 1].set_text(f"{int(memory_snapshot['end'][-1])}")
+        
+        label_texts = self._take(self._memory_labels, len(labels), lambda: self._new_label(self.memory_ax))
+        for text_obj, (text_x, text_y, text) in zip(label_texts, labels):
+            text_obj.set_position((text_x, text_y))
+            text_obj.set_text(text)
         
+        self.memory_patches = rects + label_texts + addresses
         self.memory_ax.set_title('Memory Allocation')
 
-    def update_page_table_view(self, page_table_snapshot, page_size, total_memory_size, method):
-        for patch in self.page_table_patches:
-            patch.remove()
-        self.page_table_patches = []
+    def _cell_origins(self, num_cells):
+        grid_size = int(np.ceil(np.sqrt(num_cells)))
+        cell_size = 1 / grid_size
+        index = np.arange(num_cells)
+        xs = (index % grid_size) * cell_size
+        ys = 1 - (index // grid_size + 1) * cell_size
+        return xs, ys, cell_size
+    
+    def _update_frame_grid(self, page_table_snapshot):
+        num_frames = len(page_table_snapshot)
+        xs, ys, cell_size = self._cell_origins(num_frames)
+        if self._frame_grid is None or self._frame_grid_len != num_frames:
+            if self._frame_grid is not None:
+                self._frame_grid.remove()
+            cells = [patches.Rectangle((x, y), cell_size * 0.9, cell_size * 0.9) for x, y in zip(xs, ys)]
+            self._frame_grid = PatchCollection(cells, edgecolor='black', linewidth=1, animated=True)
+            self.table_ax.add_collection(self._frame_grid)
+            self._frame_grid_len = num_frames
+        self._frame_grid.set_visible(True)
+        self._frame_grid.set_facecolors(self.colors.lookup(page_table_snapshot))
         
+        # Per-frame labels are unreadable on dense grids, so only small ones get them
+        num_labels = num_frames if num_frames <= self.MAX_LABELED_FRAMES else 0
+        labels = self._take(self._table_labels, num_labels, lambda: self._new_label(self.table_ax))
+        for frame_id, (label, pid, x, y) in enumerate(zip(labels, page_table_snapshot.tolist(), xs.tolist(), ys.tolist())):
+            text = f"F{frame_id}"
+            if pid >= 0:
+                text += f"\nP{pid}"
+            label.set_position((x + cell_size * 0.45, y + cell_size * 0.45))
+            label.set_text(text)
+        return [self._frame_grid] + labels
+    
+    def update_page_table_view(self, page_table_snapshot, page_size, total_memory_size, method):
         if method == "paging":
-            num_frames = len(page_table_snapshot)
-            grid_size = int(np.ceil(np.sqrt(num_frames)))
-            cell_width = 1 / grid_size
-            cell_height = 1 / grid_size
+            self._take(self._table_rects, 0, None)
+            self.page_table_patches = self._update_frame_grid(page_table_snapshot)
+            self.table_ax.set_title('Page Table')
+            return
+        
+        if self._frame_grid is not None:
+            self._frame_grid.set_visible(False)
+        frame_ids = np.flatnonzero(page_table_snapshot >= 0)
+        pids = page_table_snapshot[frame_ids]
+        num_segments = len(frame_ids)
+        rects = self._take(self._table_rects, num_segments, lambda: self._new_rect(self.table_ax))
+        labels = self._take(self._table_labels, num_segments, lambda: self._new_label(self.table_ax))
+        self.page_table_patches = rects + labels
+        if num_segments == 0:
+            return
+        
+        xs, ys, cell_size = self._cell_origins(num_segments)
+        colors = self.colors.lookup(pids)
+        for rect, label, frame_id, pid, color, x, y in zip(rects, labels, frame_ids.tolist(), pids.tolist(),
+                                                          colors, xs.tolist(), ys.tolist()):
+            rect.set_bounds(x, y, cell_size * 0.9, cell_size * 0.9)
+            rect.set_facecolor(color)
             
-            for i, frame in enumerate(page_table_snapshot):
-                row = i // grid_size
-                col = i % grid_size
-                
-                x = col * cell_width
-                y = 1 - (row + 1) * cell_height
-                
-                color = self._get_process_color(frame['process_id'])
-                rect = patches.Rectangle((x, y), cell_width * 0.9, cell_height * 0.9,
-                                           facecolor=color, edgecolor='black', linewidth=1)
-                self.table_ax.add_patch(rect)
-                self.page_table_patches.append(rect)
-                
-                text = f"F{frame['frame_id']}"
-                if frame['process_id'] is not None:
-                    text += f"\nP{frame['process_id']}"
-                text_obj = self.table_ax.text(x + cell_width * 0.45, y + cell_height * 0.45, 
-                                              text, ha='center', va='center', fontsize=8)
-                self.page_table_patches.append(text_obj)
+            start_addr = frame_id * page_size
+            label.set_position((x + cell_size * 0.45, y + cell_size * 0.45))
+            label.set_text(f"P{pid}\nAddr: {start_addr}\nSize: {page_size}")
+        
+        self.table_ax.set_title('Segment Table')
+
+    def update_visualization(self, memory_snapshot, 
+                             page_table_snapshot,
+                             stats, events,
+                             total_memory_size, page_size,
+                             method):
+        self.update_memory_view(memory_snapshot, total_memory_size)
+        self.update_page_table_view(page_table_snapshot, page_size, total_memory_size, method)
+
+# Lightweight alternative to MemoryVisualizer drawing straight onto a tk.Canvas
+class TkCanvasVisualizer:
+    MAX_LABELED_FRAMES = MemoryVisualizer.MAX_LABELED_FRAMES
+    # Pixel margins around each of the two views, and room for a view's title
+    MARGIN = 20
+    TITLE_HEIGHT = 20
+    
+    def __init__(self, master):
+        self.canvas = tk.Canvas(master, background='white', highlightthickness=0)
+        self.colors = ProcessColorTable()
+        self._font = ('Helvetica', 8)
+        self._small_font = ('Helvetica', 6)
+        self._memory_title = self.canvas.create_text(0, 0, text='Memory Allocation', anchor='n',
+                                                     font=('Helvetica', 10, 'bold'))
+        self._table_title = self.canvas.create_text(0, 0, text='Page/Segment Table', anchor='n',
+                                                    font=('Helvetica', 10, 'bold'))
+        # Pools of canvas items reused across updates; unused ones are hidden
+        self._memory_rects = []
+        self._memory_labels = []
+        self._address_labels = []
+        self._table_rects = []
+        self._table_labels = []
+        # Arguments of the last update, replayed when the canvas is resized
+        self._last_args = None
+        self.canvas.bind('<Configure>', self._on_configure)
+    
+    def get_widget(self):
+        """Return the tk.Canvas to pack into the GUI"""
+        return self.canvas
+    
+    def _on_configure(self, event):
+        if self._last_args is not None:
+            self.update_visualization(*self._last_args)
+    
+    def _take(self, pool, count, factory):
+        """Return count item ids from pool, creating any missing ones and hiding the rest"""
+        while len(pool) < count:
+            pool.append(factory())
+        for item in pool[count:]:
+            self.canvas.itemconfigure(item, state='hidden')
+        return pool[:count]
+    
+    def _new_rect(self):
+        return self.canvas.create_rectangle(0, 0, 0, 0, outline='black', state='hidden')
+    
+    def _new_label(self):
+        return self.canvas.create_text(0, 0, font=self._font, justify='center', state='hidden')
+    
+    def _new_address_label(self):
+        # Rotated about its east end, the text runs down from the anchor
+        return self.canvas.create_text(0, 0, font=self._small_font, angle=90, anchor='e', state='hidden')
+    
+    def _view_box(self, row):
+        """Pixel (left, top, width, height) of view row 0 (memory) or 1 (table)"""
+        width = max(self.canvas.winfo_width(), 1)
+        height = max(self.canvas.winfo_height(), 1)
+        view_height = height / 2
+        top = row * view_height + self.MARGIN + self.TITLE_HEIGHT
+        return (self.MARGIN, top, max(width - 2 * self.MARGIN, 1),
+                max(view_height - 2 * self.MARGIN - self.TITLE_HEIGHT, 1))
+    
+    def update_memory_view(self, memory_snapshot, total_memory_size):
+        canvas = self.canvas
+        left, top, width, height = self._view_box(0)
+        canvas.coords(self._memory_title, left + width / 2, top - self.TITLE_HEIGHT)
+        bar_top = top + 0.2 * height
+        bar_bottom = top + 0.8 * height
+        
+        num_blocks = len(memory_snapshot)
+        rects = self._take(self._memory_rects, num_blocks, self._new_rect)
+        addresses = self._take(self._address_labels, num_blocks + 1 if num_blocks else 0,
+                               self._new_address_label)
+        labels = []
+        pids = memory_snapshot['process_id']
+        colors = self.colors.lookup_hex(pids)
+        starts = memory_snapshot['start'].tolist()
+        start_pcts = (memory_snapshot['start'] / total_memory_size).tolist()
+        width_pcts = (memory_snapshot['size'] / total_memory_size).tolist()
+        
+        for i, (start, start_pct, width_pct, pid) in enumerate(zip(starts, start_pcts, width_pcts, pids.tolist())):
+            x0 = left + start_pct * width
+            x1 = x0 + width_pct * width
+            canvas.coords(rects[i], x0, bar_top, x1, bar_bottom)
+            canvas.itemconfigure(rects[i], fill=colors[i], state='normal')
             
-            self.table_ax.set_title('Page Table')
-        else:
-            segments = [block for block in page_table_snapshot if block['process_id'] is not None]
-            num_segments = len(segments)
-            if num_segments == 0:
-                return
-            grid_size = int(np.ceil(np.sqrt(num_segments)))
-            cell_width = 1 / grid_size
-            cell_height = 1 / grid_size
+            if width_pct > 0.05:
+                text = f"P{pid}" if pid >= 0 else "Free"
+                labels.append(((x0 + x1) / 2, (bar_top + bar_bottom) / 2, text))
             
-            for i, segment in enumerate(segments):
-                row = i // grid_size
-                col = i % grid_size
-                
-                x = col * cell_width
-                y = 1 - (row + 1) * cell_height
-                
-                color = self._get_process_color(segment['process_id'])
-                rect = patches.Rectangle((x, y), cell_width * 0.9, cell_height * 0.9,
-                                           facecolor=color, edgecolor='black', linewidth=1)
-                self.table_ax.add_patch(rect)
-                self.page_table_patches.append(rect)
-                
-                start_addr = segment['start_address']
-                end_addr = segment['end_address']
-                size = end_addr - start_addr + 1
-                
-                text = f"P{segment['process_id']}\nAddr: {start_addr}\nSize: {size}"
-                text_obj = self.table_ax.text(x + cell_width * 0.45, y + cell_height * 0.45, 
-                                              text, ha='center', va='center', fontsize=8)
-                self.page_table_patches.append(text_obj)
+            canvas.coords(addresses[i], x0, bar_bottom + 5)
+            canvas.itemconfigure(addresses[i], text=f"{start}", state='normal')
             
-            self.table_ax.set_title('Segment Table')
-
+            if i == num_blocks - 1:
+                canvas.coords(addresses[i + 1], x1, bar_bottom + 5)
+                canvas.itemconfigure(addresses[i + 1], text=f"{int(memory_snapshot['end'][-1])}", state='normal')
+        
+        for item, (x, y, text) in zip(self._take(self._memory_labels, len(labels), self._new_label), labels):
+            canvas.coords(item, x, y)
+            canvas.itemconfigure(item, text=text, state='normal')
+    
+    def _draw_cells(self, colors, texts):
+        """Lay out one labeled, colored square per entry on a near-square grid"""
+        canvas = self.canvas
+        left, top, width, height = self._view_box(1)
+        num_cells = len(colors)
+        rects = self._take(self._table_rects, num_cells, self._new_rect)
+        labels = self._take(self._table_labels, len(texts), self._new_label)
+        if num_cells == 0:
+            return
+        
+        grid_size = int(np.ceil(np.sqrt(num_cells)))
+        cell_w = width / grid_size
+        cell_h = height / grid_size
+        for i, (rect, color) in enumerate(zip(rects, colors)):
+            row, col = divmod(i, grid_size)
+            x0 = left + col * cell_w
+            y0 = top + row * cell_h
+            canvas.coords(rect, x0, y0, x0 + cell_w * 0.9, y0 + cell_h * 0.9)
+            canvas.itemconfigure(rect, fill=color, state='normal')
+            if i < len(labels):
+                canvas.coords(labels[i], x0 + cell_w * 0.45, y0 + cell_h * 0.45)
+                canvas.itemconfigure(labels[i], text=texts[i], state='normal')
+    
+    def update_page_table_view(self, page_table_snapshot, page_size, total_memory_size, method):
+        left, top, width, height = self._view_box(1)
+        if method == "paging":
+            title = 'Page Table'
+            pids = page_table_snapshot
+            texts = []
+            if len(pids) <= self.MAX_LABELED_FRAMES:
+                texts = [f"F{frame_id}" + (f"\nP{pid}" if pid >= 0 else "")
+                         for frame_id, pid in enumerate(pids.tolist())]
+        else:
+            title = 'Segment Table'
+            frame_ids = np.flatnonzero(page_table_snapshot >= 0)
+            pids = page_table_snapshot[frame_ids]
+            texts = [f"P{pid}\nAddr: {frame_id * page_size}\nSize: {page_size}"
+                     for frame_id, pid in zip(frame_ids.tolist(), pids.tolist())]
+        self.canvas.coords(self._table_title, left + width / 2, top - self.TITLE_HEIGHT)
+        self.canvas.itemconfigure(self._table_title, text=title)
+        self._draw_cells(self.colors.lookup_hex(pids), texts)
+    
     def update_visualization(self, memory_snapshot, 
                              page_table_snapshot,
                              stats, events,
                              total_memory_size, page_size,
                              method):
+        self._last_args = (memory_snapshot, page_table_snapshot, stats, events,
+                           total_memory_size, page_size, method)
         self.update_memory_view(memory_snapshot, total_memory_size)
         self.update_page_table_view(page_table_snapshot, page_size, total_memory_size, method)
 